@@ -1,12 +1,117 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Cached yfinance accessors ---
+@st.cache_resource
+def get_ticker(symbol):
+    return yf.Ticker(symbol)
+
+class StatementsUnavailable(Exception):
+    pass
+
+class HistoryUnavailable(Exception):
+    pass
+
+@st.cache_data(persist="disk", max_entries=256)
+def get_statements(symbol, quarter):
+    # Filings only change quarterly, so the disk cache is keyed by `quarter`
+    # and survives app restarts. The three requests are independent, so they
+    # are fetched concurrently.
+    stock = get_ticker(symbol)
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        financials = ex.submit(lambda: stock.financials)
+        balance_sheet = ex.submit(lambda: stock.balance_sheet)
+        cashflow = ex.submit(lambda: stock.cashflow)
+    statements = financials.result(), balance_sheet.result(), cashflow.result()
+    # yfinance returns empty frames on request errors; raising keeps them out of the cache
+    if any(frame.empty for frame in statements):
+        raise StatementsUnavailable(symbol)
+    return statements
+
+# No spinner: build_table calls this from a worker thread without a script context
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_history(symbol, period):
+    hist = get_ticker(symbol).history(period=period)
+    # Same rule as get_statements: an empty frame is a failed request, don't cache it
+    if hist.empty:
+        raise HistoryUnavailable(symbol)
+    return hist
+
+@st.cache_data(ttl=3600)
+def get_shares_outstanding(symbol):
+    # fast_info avoids downloading and parsing the full quoteSummary payload
+    return get_ticker(symbol).fast_info.shares
 
-def safe_div(a, b):
-    try:
-        return a / b
-    except:
-        return None
+# --- Financials (5 Years) ---
+@st.cache_data(ttl=3600)
+def build_table(symbol):
+    # Fetch the price history alongside the statements so a cold render only
+    # waits for the slowest request
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        hist_10y = ex.submit(get_history, symbol, "10y")
+        financials, balance_sheet, cashflow = get_statements(symbol, str(pd.Timestamp.today().to_period('Q')))
+    hist_10y = hist_10y.result()
+
+    # The 5-year window is a suffix of the 10-year history
+    hist = hist_10y[hist_10y.index >= hist_10y.index.max() - pd.DateOffset(years=5)]
+    year_ends = hist.resample('YE').last()
+
+    financials = financials.T
+    balance_sheet = balance_sheet.T
+    cashflow = cashflow.T
+
+    years = financials.index[:5]
+    shares_outstanding = get_shares_outstanding(symbol) or np.nan
+
+    # Year-end prices are paired with fiscal years by position
+    prices = np.full(len(years), np.nan)
+    n_prices = min(len(years), len(year_ends))
+    prices[:n_prices] = year_ends['Close'].to_numpy()[:n_prices]
+
+    # Only keep years reported in all three statements
+    reported = years.isin(balance_sheet.index) & years.isin(cashflow.index)
+    years, prices = years[reported], prices[reported]
+
+    # Pull each line item out once as a plain array aligned to `years`
+    net_income, total_revenue = financials.reindex(
+        index=years, columns=['Net Income', 'Total Revenue']).to_numpy(np.float64).T
+    total_debt, equity = balance_sheet.reindex(
+        index=years, columns=['Total Debt', 'Total Stockholder Equity']).to_numpy(np.float64).T
+    cash_from_ops, capex = cashflow.reindex(
+        index=years, columns=['Total Cash From Operating Activities', 'Capital Expenditures']).to_numpy(np.float64).T
+
+    fcf = cash_from_ops + capex  # Capex is negative
+    market_cap = prices * shares_outstanding
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df = pd.DataFrame({
+            "Year": [y.year if hasattr(y, 'year') else str(y) for y in years],
+            "Net Income": net_income,
+            "Total Debt": total_debt,
+            "Equity": equity,
+            "Free Cash Flow": fcf,
+            "ROE (%)": net_income / equity * 100,
+            "Debt/Equity": total_debt / equity,
+            "Profit Margin (%)": net_income / total_revenue * 100,
+            "P/E": market_cap / net_income,
+            "P/B": market_cap / equity,
+            "P/S": market_cap / total_revenue,
+            "P/FCF": market_cap / fcf,
+        }).replace([np.inf, -np.inf], np.nan)
+    return df
+
+# --- 10-Year Price Movement ---
+@st.cache_data(ttl=3600)
+def build_10y(symbol):
+    # Daily resolution over 10 years is invisible on screen, so chart weekly closes
+    return get_history(symbol, "10y")['Close'].resample('W').last()
+
+@st.fragment
+def show_chart(series):
+    st.line_chart(series)
 
 st.title("📊 5-Year Buffett-Style Stock Performance Analyzer with Valuation Ratios and 10-Year Price Chart")
 
@@ -14,112 +119,46 @@ ticker = st.text_input("Enter ticker:", "AAPL").upper()
 if not ticker:
     st.stop()
 
-stock = yf.Ticker(ticker)
-
-# --- Financials (5 Years) ---
-hist = stock.history(period="5y")
-year_ends = hist.resample('Y').last()
-
-financials = stock.financials.T
-balance_sheet = stock.balance_sheet.T
-cashflow = stock.cashflow.T
-
-years = financials.index[:5]
-
-results = []
-
-for i, year in enumerate(years):
-    try:
-        net_income = financials.loc[year].get('Net Income', None)
-        total_debt = balance_sheet.loc[year].get('Total Debt', None)
-        equity = balance_sheet.loc[year].get('Total Stockholder Equity', None)
-        total_revenue = financials.loc[year].get('Total Revenue', None)
-        cash_from_ops = cashflow.loc[year].get('Total Cash From Operating Activities', None)
-        capex = cashflow.loc[year].get('Capital Expenditures', None)
-
-        fcf = None
-        if cash_from_ops is not None and capex is not None:
-            fcf = cash_from_ops + capex  # Capex is negative
-
-        roe = safe_div(net_income, equity) * 100 if net_income and equity and equity != 0 else None
-        debt_to_equity = safe_div(total_debt, equity) if total_debt and equity and equity != 0 else None
-        profit_margin = safe_div(net_income, total_revenue) * 100 if net_income and total_revenue else None
-
-        price_date = year_ends.index[i] if i < len(year_ends) else None
-        price = year_ends.loc[price_date]['Close'] if price_date is not None else None
-
-        shares_outstanding = stock.info.get('sharesOutstanding', None)
-        market_cap = price * shares_outstanding if price and shares_outstanding else None
+try:
+    df = build_table(ticker)
+except StatementsUnavailable:
+    st.error(f"Could not download financial statements for {ticker}. Please try again later.")
+    st.stop()
+except HistoryUnavailable:
+    st.error(f"Could not download price history for {ticker}. Please try again later.")
+    st.stop()
 
-        pe = safe_div(price, safe_div(net_income, shares_outstanding)) if net_income and shares_outstanding and price else None
-        pb = safe_div(price, safe_div(equity, shares_outstanding)) if equity and shares_outstanding and price else None
-        ps = safe_div(price, safe_div(total_revenue, shares_outstanding)) if total_revenue and shares_outstanding and price else None
-        pfcf = safe_div(price, safe_div(fcf, shares_outstanding)) if fcf and shares_outstanding and price else None
-
-        results.append({
-            "Year": year.year if hasattr(year, 'year') else str(year),
-            "Net Income": net_income,
-            "Total Debt": total_debt,
-            "Equity": equity,
-            "Free Cash Flow": fcf,
-            "ROE (%)": roe,
-            "Debt/Equity": debt_to_equity,
-            "Profit Margin (%)": profit_margin,
-            "P/E": pe,
-            "P/B": pb,
-            "P/S": ps,
-            "P/FCF": pfcf
-        })
-    except Exception:
-        continue
-
-df = pd.DataFrame(results)
-
-def fmt_currency(x):
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return ""
-    return f"${x:,.0f}"
-
-def fmt_percent(x):
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return ""
-    return f"{x:.2f}%"
-
-def fmt_float(x):
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return ""
-    return f"{x:.2f}"
+CURRENCY_FMT = "${:,.0f}"
+PERCENT_FMT = "{:.2f}%"
+FLOAT_FMT = "{:.2f}"
 
 st.subheader(f"{ticker} Financials + Valuation Ratios (Last 5 Years)")
 st.dataframe(df.style.format({
-    "Net Income": fmt_currency,
-    "Total Debt": fmt_currency,
-    "Equity": fmt_currency,
-    "Free Cash Flow": fmt_currency,
-    "ROE (%)": fmt_percent,
-    "Debt/Equity": fmt_float,
-    "Profit Margin (%)": fmt_percent,
-    "P/E": fmt_float,
-    "P/B": fmt_float,
-    "P/S": fmt_float,
-    "P/FCF": fmt_float
-}))
+    "Net Income": CURRENCY_FMT,
+    "Total Debt": CURRENCY_FMT,
+    "Equity": CURRENCY_FMT,
+    "Free Cash Flow": CURRENCY_FMT,
+    "ROE (%)": PERCENT_FMT,
+    "Debt/Equity": FLOAT_FMT,
+    "Profit Margin (%)": PERCENT_FMT,
+    "P/E": FLOAT_FMT,
+    "P/B": FLOAT_FMT,
+    "P/S": FLOAT_FMT,
+    "P/FCF": FLOAT_FMT
+}, na_rep=""))
 
 # Buffett-style evaluation
-good_years = 0
+meets_criteria = (df["Net Income"] > 0) \
+    & (df["ROE (%)"] > 15) \
+    & (df["Profit Margin (%)"] > 10) \
+    & (df["Debt/Equity"] < 0.5) \
+    & (df["P/E"] < 20) \
+    & (df["P/B"] < 3) \
+    & (df["P/S"] < 4) \
+    & (df["P/FCF"].isna() | (df["P/FCF"] < 20))
+good_years = int(meets_criteria.sum())
 total_years = len(df)
 
-for _, row in df.iterrows():
-    if row["Net Income"] and row["Net Income"] > 0 \
-       and row["ROE (%)"] and row["ROE (%)"] > 15 \
-       and row["Profit Margin (%)"] and row["Profit Margin (%)"] > 10 \
-       and row["Debt/Equity"] and row["Debt/Equity"] < 0.5 \
-       and row["P/E"] and row["P/E"] < 20 \
-       and row["P/B"] and row["P/B"] < 3 \
-       and row["P/S"] and row["P/S"] < 4 \
-       and (row["P/FCF"] is None or row["P/FCF"] < 20):
-        good_years += 1
-
 if total_years == 0:
     st.error("Insufficient data to analyze.")
 else:
@@ -150,17 +189,19 @@ else:
 # --- 10-Year Price Movement Chart ---
 st.subheader(f"📈 {ticker} 10-Year Price Movement")
 
-hist_10y = stock.history(period="10y")
+try:
+    hist_10y = get_history(ticker, "10y")
+except HistoryUnavailable:
+    hist_10y = None
 
-if hist_10y.empty:
+if hist_10y is None:
     st.write("No 10-year price data available.")
 else:
-    price_10y = hist_10y['Close']
-    st.line_chart(price_10y)
+    show_chart(build_10y(ticker))
 
-    # Add price interpretation below the chart
-    start_price = price_10y.iloc[0]
-    end_price = price_10y.iloc[-1]
+    # Add price interpretation below the chart, using the daily endpoints
+    start_price = hist_10y['Close'].iloc[0]
+    end_price = hist_10y['Close'].iloc[-1]
     change_pct = ((end_price - start_price) / start_price) * 100
 
     st.markdown(f"""
@@ -2,59 +2,233 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import datetime
+import os
 import requests
-from textblob import TextBlob
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from numba import njit
 
 # 1. Fetch stock data
-def fetch_stock_data(symbol, start_date, end_date):
-    df = yf.download(symbol, start=start_date, end=end_date)
-    return df
+DATA_CACHE_DIR = "stock_data_cache"
+# Cached histories are fully refetched after this long, whatever the overlap check says
+DATA_CACHE_MAX_AGE = pd.Timedelta(days=7)
+
+def load_cached_prices(symbol):
+    path = os.path.join(DATA_CACHE_DIR, f"{symbol}.pkl")
+    if os.path.exists(path):
+        entry = pd.read_pickle(path)
+        if isinstance(entry, dict):
+            return entry
+    return None
+
+def save_cached_prices(symbol, start, fetched, df):
+    # `start` is the requested start date, which may fall before the first trading day
+    os.makedirs(DATA_CACHE_DIR, exist_ok=True)
+    pd.to_pickle({'start': start, 'fetched': fetched, 'prices': df},
+                 os.path.join(DATA_CACHE_DIR, f"{symbol}.pkl"))
+
+def download_prices(tickers, start, end):
+    data = yf.download(tickers, start=start, end=end, threads=True, progress=False,
+                       auto_adjust=False, group_by='ticker')
+    if isinstance(data.columns, pd.MultiIndex):
+        return {t: data[t].dropna(how='all') for t in data.columns.get_level_values(0).unique()}
+    return {tickers[0]: data.dropna(how='all')} if not data.empty else {}
+
+def fetch_stock_data(symbols, start_date, end_date):
+    tickers = [symbols] if isinstance(symbols, str) else list(symbols)
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    now = pd.Timestamp.now()
+
+    cached = {}
+    for t in tickers:
+        entry = load_cached_prices(t)
+        if entry is not None and entry['start'] <= start and now - entry['fetched'] < DATA_CACHE_MAX_AGE \
+                and len(entry['prices']) >= 2:
+            cached[t] = entry
+
+    # Only download from the second-latest cached day onward. The latest day may
+    # have been cached mid-session; the one before it is a settled close, so a
+    # change there means Yahoo re-adjusted the history (e.g. for a split).
+    fetch_start = min(cached[t]['prices'].index[-2] if t in cached else start for t in tickers)
+    downloaded = download_prices(tickers, fetch_start, end) if fetch_start < end else {}
+
+    stale = []
+    for t, entry in list(cached.items()):
+        old, new = entry['prices'], downloaded.get(t)
+        overlap = old.index[-2]
+        if new is not None and overlap in new.index \
+                and not np.isclose(old.loc[overlap, 'Close'], new.loc[overlap, 'Close']):
+            del cached[t]
+            stale.append(t)
+    if stale and fetch_start > start:
+        downloaded.update(download_prices(stale, start, end))
+
+    frames = {}
+    for t in tickers:
+        entry = cached.get(t)
+        df = entry['prices'] if entry else None
+        if t in downloaded:
+            new = downloaded[t]
+            df = new if df is None else pd.concat([df, new])
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            if not df.empty:
+                if entry:
+                    save_cached_prices(t, entry['start'], entry['fetched'], df)
+                else:
+                    save_cached_prices(t, start, now, df)
+        if df is None:
+            df = pd.DataFrame()
+        else:
+            df = df[(df.index >= start) & (df.index < end)]
+        frames[t] = df
+
+    if isinstance(symbols, str):
+        return frames[symbols]
+    return pd.concat(frames, axis=1)
 
 # 2. Calculate indicators (RSI, MACD, Stochastic)
-def calculate_indicators(df):
-    delta = df['Close'].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
+# fastmath without 'nnan'/'ninf' so the NaN warm-up periods stay well defined.
+# The explicit signatures compile the kernels at import for contiguous float32 input.
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+@njit('void(f4[::1], i8, f4[::1])', cache=True, fastmath=_FASTMATH, error_model='numpy')
+def _rolling_mean(x, window, out):
+    total = 0.0
+    nans = 0
+    for i in range(x.shape[0]):
+        if np.isnan(x[i]):
+            nans += 1
+        else:
+            total += x[i]
+        if i >= window:
+            if np.isnan(x[i - window]):
+                nans -= 1
+            else:
+                total -= x[i - window]
+        out[i] = total / window if i >= window - 1 and nans == 0 else np.nan
+
+@njit('void(f4[::1], i8, f4[::1])', cache=True, fastmath=_FASTMATH, error_model='numpy')
+def _ema(x, span, out):
+    # Same recurrence as pandas ewm(adjust=False, ignore_na=False): the old
+    # value keeps decaying by (1 - alpha) across NaN gaps
+    alpha = 2.0 / (span + 1.0)
+    ema = np.nan
+    old_wt = 1.0
+    for i in range(x.shape[0]):
+        if np.isnan(ema):
+            ema = x[i]
+        else:
+            old_wt *= 1.0 - alpha
+            if not np.isnan(x[i]):
+                ema = (old_wt * ema + alpha * x[i]) / (old_wt + alpha)
+                old_wt = 1.0
+        out[i] = ema
+
+@njit('void(f4[::1], i8, f4[::1], b1)', cache=True, fastmath=_FASTMATH, error_model='numpy')
+def _rolling_extreme(x, window, out, is_max):
+    # Monotonic deque of indices; the front always holds the window extreme
+    dq = np.empty(x.shape[0], dtype=np.int64)
+    head = 0
+    tail = 0
+    nans = 0
+    for i in range(x.shape[0]):
+        if i >= window and np.isnan(x[i - window]):
+            nans -= 1
+        if head < tail and dq[head] <= i - window:
+            head += 1
+        if np.isnan(x[i]):
+            nans += 1
+        else:
+            while head < tail and ((x[dq[tail - 1]] <= x[i]) if is_max else (x[dq[tail - 1]] >= x[i])):
+                tail -= 1
+            dq[tail] = i
+            tail += 1
+        out[i] = x[dq[head]] if i >= window - 1 and nans == 0 else np.nan
+
+@njit('UniTuple(f4[::1], 7)(f4[::1], f4[::1], f4[::1])', cache=True, fastmath=_FASTMATH, error_model='numpy')
+def _indicators(close, high, low):
+    n = close.shape[0]
+    rsi = np.empty_like(close)
+    macd = np.empty_like(close)
+    signal = np.empty_like(close)
+    k = np.empty_like(close)
+    d = np.empty_like(close)
+    sma50 = np.empty_like(close)
+    sma200 = np.empty_like(close)
+
+    gain = np.empty_like(close)
+    loss = np.empty_like(close)
+    if n > 0:
+        gain[0] = np.nan
+        loss[0] = np.nan
+    for i in range(1, n):
+        delta = close[i] - close[i - 1]
+        gain[i] = delta if delta > 0 else (np.nan if np.isnan(delta) else 0.0)
+        loss[i] = -delta if delta < 0 else (np.nan if np.isnan(delta) else 0.0)
 
     window_length = 14
-    avg_gain = gain.rolling(window=window_length).mean()
-    avg_loss = loss.rolling(window=window_length).mean()
+    avg_gain = np.empty_like(close)
+    avg_loss = np.empty_like(close)
+    _rolling_mean(gain, window_length, avg_gain)
+    _rolling_mean(loss, window_length, avg_loss)
+    for i in range(n):
+        rsi[i] = 100.0 - (100.0 / (1.0 + avg_gain[i] / avg_loss[i]))
+
+    exp1 = np.empty_like(close)
+    exp2 = np.empty_like(close)
+    _ema(close, 12, exp1)
+    _ema(close, 26, exp2)
+    for i in range(n):
+        macd[i] = exp1[i] - exp2[i]
+    _ema(macd, 9, signal)
+
+    low14 = np.empty_like(close)
+    high14 = np.empty_like(close)
+    _rolling_extreme(low, 14, low14, False)
+    _rolling_extreme(high, 14, high14, True)
+    for i in range(n):
+        k[i] = 100.0 * ((close[i] - low14[i]) / (high14[i] - low14[i]))
+    _rolling_mean(k, 3, d)
+
+    _rolling_mean(close, 50, sma50)
+    _rolling_mean(close, 200, sma200)
+
+    return rsi, macd, signal, k, d, sma50, sma200
 
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-
-    exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-    exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = exp1 - exp2
-    df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
+def calculate_indicators(df):
+    # float32 halves the memory traffic; the kernels still accumulate in float64
+    close = np.ascontiguousarray(df['Close'].to_numpy(np.float32))
+    high = np.ascontiguousarray(df['High'].to_numpy(np.float32))
+    low = np.ascontiguousarray(df['Low'].to_numpy(np.float32))
 
-    low14 = df['Low'].rolling(window=14).min()
-    high14 = df['High'].rolling(window=14).max()
-    df['%K'] = 100 * ((df['Close'] - low14) / (high14 - low14))
-    df['%D'] = df['%K'].rolling(window=3).mean()
+    rsi, macd, signal, k, d, sma50, sma200 = _indicators(close, high, low)
 
-    df['SMA50'] = df['Close'].rolling(window=50).mean()
-    df['SMA200'] = df['Close'].rolling(window=200).mean()
+    df['RSI'] = rsi
+    df['MACD'] = macd
+    df['Signal'] = signal
+    df['%K'] = k
+    df['%D'] = d
+    df['SMA50'] = sma50
+    df['SMA200'] = sma200
 
     return df
 
 # 3. Detect crosses (Golden/Death Cross and MACD signal cross)
 def detect_crosses(df):
     cross_type = "None"
-    macd_signal_crossover = None
 
     if len(df) >= 200:
-        if df['SMA50'].iloc[-2] < df['SMA200'].iloc[-2] and df['SMA50'].iloc[-1] > df['SMA200'].iloc[-1]:
-            cross_type = "Golden Cross"
-        elif df['SMA50'].iloc[-2] > df['SMA200'].iloc[-2] and df['SMA50'].iloc[-1] < df['SMA200'].iloc[-1]:
-            cross_type = "Death Cross"
+        a, b = df['SMA50'].to_numpy()[-2:], df['SMA200'].to_numpy()[-2:]
+        golden = (a[0] < b[0]) & (a[1] > b[1])
+        death = (a[0] > b[0]) & (a[1] < b[1])
+        cross_type = ("None", "Golden Cross", "Death Cross")[golden + 2 * death]
 
-    if df['MACD'].iloc[-2] < df['Signal'].iloc[-2] and df['MACD'].iloc[-1] > df['Signal'].iloc[-1]:
-        macd_signal_crossover = "Bullish Crossover"
-    elif df['MACD'].iloc[-2] > df['Signal'].iloc[-2] and df['MACD'].iloc[-1] < df['Signal'].iloc[-1]:
-        macd_signal_crossover = "Bearish Crossover"
+    m, s = df['MACD'].to_numpy()[-2:], df['Signal'].to_numpy()[-2:]
+    bullish = (m[0] < s[0]) & (m[1] > s[1])
+    bearish = (m[0] > s[0]) & (m[1] < s[1])
+    macd_signal_crossover = (None, "Bullish Crossover", "Bearish Crossover")[bullish + 2 * bearish]
 
     return cross_type, macd_signal_crossover
 
@@ -73,30 +247,37 @@ def fetch_fundamentals(ticker):
 
 # 5. Plot stock price and SMA lines
 def plot_stock(df, symbol):
-    plt.figure(figsize=(14,7))
-    plt.plot(df.index, df['Close'], label='Close Price')
-    plt.plot(df.index, df['SMA50'], label='SMA 50')
-    plt.plot(df.index, df['SMA200'], label='SMA 200')
-    plt.title(f"{symbol} Price Chart")
-    plt.xlabel('Date')
-    plt.ylabel('Price ($)')
-    plt.legend()
-    plt.grid()
-    st.pyplot(plt)
-    plt.clf()
+    # Vega-Lite renders client-side, so no matplotlib figure is built per run
+    chart_data = df[['Close', 'SMA50', 'SMA200']].rename(
+        columns={'Close': f'{symbol} Close Price', 'SMA50': 'SMA 50', 'SMA200': 'SMA 200'})
+    st.line_chart(chart_data)
 
 # 6. Fetch news headlines using NewsAPI
+NEWS_BASE = "https://newsapi.org/v2/everything"
+
+# Streamlit re-executes this script on every rerun, so the session is held by
+# st.cache_resource to keep one keep-alive connection pool per process
+@st.cache_resource
+def get_news_session():
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                          max_retries=Retry(total=2, backoff_factor=0.1)))
+    return session
+
+@st.cache_data(ttl=600)
 def fetch_newsapi_news(symbol, max_articles=7):
     api_key = "YOUR_NEWSAPI_KEY"  # Replace this
-    url = (
-        f"https://newsapi.org/v2/everything?"
-        f"q={symbol}&"
-        f"pageSize={max_articles}&"
-        f"sortBy=publishedAt&"
-        f"language=en&"
-        f"apiKey={api_key}"
-    )
-    response = requests.get(url)
+    params = {
+        'q': symbol,
+        'pageSize': max_articles,
+        'sortBy': 'publishedAt',
+        'language': 'en',
+        'apiKey': api_key,
+    }
+    try:
+        response = get_news_session().get(NEWS_BASE, params=params, timeout=5)
+    except requests.RequestException:
+        return [], []
     if response.status_code != 200:
         return [], []
     data = response.json()
@@ -106,11 +287,22 @@ def fetch_newsapi_news(symbol, max_articles=7):
     return headlines, links
 
 # 7. Sentiment analysis on news headlines
+# One analyzer per process; building it re-reads the VADER lexicon files
+@st.cache_resource
+def get_sentiment_analyzer():
+    return SentimentIntensityAnalyzer()
+
+# st.cache_data rather than lru_cache: the memo has to outlive script reruns
+@st.cache_data(max_entries=4096, show_spinner=False)
+def headline_polarity(headline):
+    return get_sentiment_analyzer().polarity_scores(headline)['compound']
+
+@st.cache_data
 def sentiment_analysis(headlines):
     if not headlines:
         return None, "No headlines to analyze."
-    polarity_scores = [TextBlob(headline).sentiment.polarity for headline in headlines]
-    avg_sentiment = np.mean(polarity_scores)
+    polarity_scores = np.fromiter((headline_polarity(h) for h in headlines), dtype=np.float64, count=len(headlines))
+    avg_sentiment = polarity_scores.mean()
     if avg_sentiment > 0.05:
         summary = "Positive"
     elif avg_sentiment < -0.05:
@@ -193,7 +385,7 @@ def main():
         else:
             st.write("No recent news found from NewsAPI.")
 
-        avg_sentiment, sentiment_summary = sentiment_analysis(headlines)
+        avg_sentiment, sentiment_summary = sentiment_analysis(tuple(headlines))
         st.subheader("News Sentiment Analysis")
         if avg_sentiment is not None:
             st.write(f"Sentiment: **{sentiment_summary}** (Average polarity score: {avg_sentiment:.2f})")
@@ -2,6 +2,7 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
 import datetime
 import requests
@@ -13,14 +14,21 @@ def fetch_stock_data(symbol, start_date, end_date):
     return df
 
 # 2. Calculate indicators (RSI, MACD, Stochastic, SMAs)
+def rolling_reduce(series, window, func):
+    values = series.to_numpy(np.float64)
+    if len(values) < window:
+        return np.full(len(values), np.nan)
+    windows = sliding_window_view(values, window)
+    return np.concatenate([np.full(window - 1, np.nan), func(windows, axis=1)])
+
 def calculate_indicators(df):
     delta = df['Close'].diff()
     gain = delta.clip(lower=0)
     loss = -delta.clip(upper=0)
 
     window_length = 14
-    avg_gain = gain.rolling(window=window_length).mean()
-    avg_loss = loss.rolling(window=window_length).mean()
+    avg_gain = rolling_reduce(gain, window_length, np.mean)
+    avg_loss = rolling_reduce(loss, window_length, np.mean)
 
     rs = avg_gain / avg_loss
     df['RSI'] = 100 - (100 / (1 + rs))
@@ -30,15 +38,15 @@ def calculate_indicators(df):
     df['MACD'] = exp1 - exp2
     df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
 
-    low14 = df['Low'].rolling(window=14).min()
-    high14 = df['High'].rolling(window=14).max()
+    low14 = rolling_reduce(df['Low'], 14, np.min)
+    high14 = rolling_reduce(df['High'], 14, np.max)
     df['%K'] = 100 * ((df['Close'] - low14) / (high14 - low14))
-    df['%D'] = df['%K'].rolling(window=3).mean()
+    df['%D'] = rolling_reduce(df['%K'], 3, np.mean)
 
-    df['SMA20'] = df['Close'].rolling(window=20).mean()
-    df['SMA50'] = df['Close'].rolling(window=50).mean()
-    df['SMA100'] = df['Close'].rolling(window=100).mean()
-    df['SMA200'] = df['Close'].rolling(window=200).mean()
+    df['SMA20'] = rolling_reduce(df['Close'], 20, np.mean)
+    df['SMA50'] = rolling_reduce(df['Close'], 50, np.mean)
+    df['SMA100'] = rolling_reduce(df['Close'], 100, np.mean)
+    df['SMA200'] = rolling_reduce(df['Close'], 200, np.mean)
 
     return df
 